@@ -4,9 +4,10 @@
 Alpha Discovery API — FastAPI Application
 """
 
-import json
 import threading
+import orjson
 from fastapi import FastAPI, HTTPException, Query, Request, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from datetime import datetime, timezone, timedelta
@@ -22,7 +23,7 @@ from api.services.options import OptionsService
 from api.services.news import NewsService
 from api.services.kimi import KimiService
 from api.services.alpha import AlphaService
-from api.services.chat import ChatService
+from api.services.chat import ChatService, CachedToolExecutor
 from api.services.chart import ChartService
 from api.services.market_pulse import market_pulse_service
 
@@ -494,8 +495,8 @@ def execute_tool(tool_name: str, arguments: dict) -> dict:
         return {"error": str(e)}
 
 
-# Initialize chat service with tool executor
-chat_service = ChatService(tool_executor=execute_tool)
+# Initialize chat service with tool executor (cached - scanner data only changes every few seconds)
+chat_service = ChatService(tool_executor=CachedToolExecutor(execute_tool))
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -884,6 +885,10 @@ async def scan_market(request: ScanRequest):
 # CHAT ENDPOINT (Streaming)
 # ═══════════════════════════════════════════════════════════════
 
+# Tool results can carry numpy scalars and non-string dict keys
+SSE_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
 @app.post("/api/chat")
 async def chat(request: Request):
     """
@@ -911,10 +916,12 @@ async def chat(request: Request):
         raise HTTPException(status_code=400, detail="No messages provided")
     
     if stream:
-        async def generate():
+        # Plain generator: Starlette iterates it in its threadpool, so the
+        # blocking OpenRouter read never stalls the event loop
+        def generate():
             for chunk in chat_service.chat_stream(messages):
                 # Use default=str to handle non-serializable objects like Timestamps
-                yield f"data: {json.dumps(chunk, default=str)}\n\n"
+                yield b"data: " + orjson.dumps(chunk, default=str, option=SSE_JSON_OPTIONS) + b"\n\n"
         
         return StreamingResponse(
             generate(),
@@ -925,8 +932,9 @@ async def chat(request: Request):
             }
         )
     else:
-        # Non-streaming response
-        result = chat_service.chat_sync(messages)
+        # Non-streaming response - runs in the threadpool so the blocking
+        # OpenRouter call doesn't stall the event loop
+        result = await run_in_threadpool(chat_service.chat_sync, messages)
         return result
 
 
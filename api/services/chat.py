@@ -7,11 +7,20 @@ Enables Kimi to call Python analysis tools during conversation
 
 import os
 import re
+import sys
 import json
+import functools
+import orjson
 import time
+import atexit
+import hashlib
 import requests
 import logging
-from typing import Generator, Optional, Any
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_for_futures
+from typing import Generator, Iterable, Optional, Any
 from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
@@ -23,12 +32,214 @@ from api.config import (
     OPENROUTER_APP_NAME,
     OPENROUTER_APP_URL,
 )
+from api.services.stock_data import SimpleCache
+
+
+# Rows kept per list (scanner hits, articles) when tool data goes back to the model
+MAX_ROWS_PER_TOOL = 30
+
+
+def dumps_tool_data(data: Any) -> str:
+    """Serialize tool data to compact JSON with orjson (str() for anything it can't encode natively)"""
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    return orjson.dumps(data, default=str, option=option).decode("utf-8")
+
+
+# Parses the leading JSON value of a string and ignores whatever follows it
+JSON_DECODER = json.JSONDecoder()
+
+# Shared stand-in for a missing delta or function object in an SSE frame (read-only)
+EMPTY_DELTA: dict = {}
+
+
+def parse_openai_frame(data: bytes) -> Optional[tuple[dict, Optional[str]]]:
+    """
+    Pull (delta, finish_reason) for the first choice out of an SSE frame
+    
+    Returns None for frames with no choices or that aren't valid JSON.
+    """
+    try:
+        choices = orjson.loads(data).get("choices")
+    except (orjson.JSONDecodeError, AttributeError):
+        return None
+    if not choices:
+        return None
+    choice = choices[0]
+    return choice.get("delta") or EMPTY_DELTA, choice.get("finish_reason")
+
+
+def fast_content(data: bytes) -> Optional[str]:
+    """
+    Pull delta.content straight out of a plain text SSE frame
+    
+    Returns None when the frame needs a full parse: tool calls, a finish
+    reason, null content or any layout this byte scan doesn't expect.
+    """
+    # Exactly one "content" key, and it holds a string
+    start = data.find(b'"content"')
+    if (
+        start == -1
+        or not data.startswith(b'":"', start + 8)
+        or data.find(b'"content"', start + 9) != -1
+        or b'"tool_calls"' in data
+    ):
+        return None
+    finish = data.find(b'"finish_reason":')
+    if finish != -1 and not data.startswith(b"null", finish + 16):
+        return None
+    
+    # Find the closing quote - one preceded by an even run of backslashes
+    start += 10
+    end = start + 1
+    while True:
+        end = data.find(b'"', end)
+        if end == -1:
+            return None
+        escapes = 0
+        while data[end - 1 - escapes] == 0x5C:
+            escapes += 1
+        if not escapes % 2:
+            break
+        end += 1
+    
+    if b"\\" not in data[start:end]:
+        return data[start + 1:end].decode("utf-8")
+    try:
+        return orjson.loads(data[start:end + 1])
+    except orjson.JSONDecodeError:
+        return None
+
+
+# A bare number or literal at the very end of a fragment - possibly cut short
+TRAILING_SCALAR = re.compile(r"[\w.+-]+\s*$")
+
+
+def close_json(fragment: str) -> str:
+    """
+    Close a truncated JSON fragment in one pass
+    
+    Tracks open strings and brackets (ignoring any inside strings) and
+    appends whatever is needed to balance them. A value cut off at the end
+    (a string or bare number/literal) is dropped along with its key rather
+    than kept shortened - "AA" cut from "AAPL" would be a different ticker.
+    """
+    closers = []
+    in_string = escaped = False
+    string_start = last_string_start = 0
+    for i, ch in enumerate(fragment):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+                last_string_start = string_start
+        elif ch == '"':
+            in_string = True
+            string_start = i
+        elif ch == "{":
+            closers.append("}")
+        elif ch == "[":
+            closers.append("]")
+        elif ch in "}]" and closers:
+            closers.pop()
+    
+    if in_string:
+        fragment = fragment[:string_start]
+    else:
+        fragment = TRAILING_SCALAR.sub("", fragment)
+    
+    # Drop the key left without a value, then any dangling separator
+    fragment = fragment.rstrip()
+    if fragment.endswith(":"):
+        fragment = fragment[:last_string_start]
+    fragment = fragment.rstrip().rstrip(",")
+    return fragment + "".join(reversed(closers))
+
+
+def parse_tool_arguments(args_str: str) -> dict:
+    """
+    Parse a tool call's accumulated argument string
+    
+    Arguments cut off mid-object are closed with close_json and parsed again;
+    anything that still isn't an object is kept as {"raw": ...}.
+    """
+    stripped = args_str.strip()
+    if not stripped:
+        return {}
+    if stripped[0] != "{":
+        return {"raw": args_str}
+    
+    if stripped[-1] == "}":
+        try:
+            return orjson.loads(stripped)
+        except orjson.JSONDecodeError:
+            pass
+    
+    try:
+        args = orjson.loads(close_json(stripped))
+    except orjson.JSONDecodeError:
+        return {"raw": args_str}
+    return args if isinstance(args, dict) else {"raw": args_str}
+
+
+def complete_tool_arguments(args_str: str) -> Optional[dict]:
+    """The argument object if args_str already holds a complete one, else None (no repair)"""
+    stripped = args_str.strip()
+    if not stripped.startswith("{") or not stripped.endswith("}"):
+        return None
+    try:
+        args = orjson.loads(stripped)
+    except orjson.JSONDecodeError:
+        return None
+    return args if isinstance(args, dict) else None
+
+
+def truncate_rows(data: Any, max_rows: int = MAX_ROWS_PER_TOOL) -> Any:
+    """Cap the top-level lists in a tool result dict to max_rows entries"""
+    if not isinstance(data, dict) or not any(isinstance(v, list) and len(v) > max_rows for v in data.values()):
+        return data
+    return {k: v[:max_rows] if isinstance(v, list) else v for k, v in data.items()}
+
+
+# Past this many characters the tool data sent to the model is shrunk further
+MAX_TOOL_DATA_CHARS = 16384
+SHRUNK_ROWS = 10
+SHRUNK_STRING_CHARS = 200
+
+
+def shrink_tool_data(data: Any) -> Any:
+    """Cap every list to SHRUNK_ROWS and every long string to SHRUNK_STRING_CHARS, keeping all keys"""
+    if isinstance(data, dict):
+        return {k: shrink_tool_data(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [shrink_tool_data(v) for v in data[:SHRUNK_ROWS]]
+    if isinstance(data, str) and len(data) > SHRUNK_STRING_CHARS:
+        return f"{data[:SHRUNK_STRING_CHARS]}... ({len(data)} chars)"
+    return data
+
+
+def encode_tool_data(data: Any) -> str:
+    """Serialize tool data for the follow-up call, shrinking it if it runs past MAX_TOOL_DATA_CHARS"""
+    encoded = dumps_tool_data(data)
+    if len(encoded) <= MAX_TOOL_DATA_CHARS:
+        return encoded
+    
+    shrunk = dumps_tool_data(shrink_tool_data(data))
+    logger.info("[CHAT] Tool data shrunk from %d to %d chars", len(encoded), len(shrunk))
+    return shrunk
 
 
 # ═══════════════════════════════════════════════════════════════
 # TOOL DEFINITIONS
 # ═══════════════════════════════════════════════════════════════
 
+# Parameter schemas shared by several tools
+SYMBOL_PARAM = {"type": "string", "description": "Ticker symbol (e.g., AAPL)"}
+MARKET_CAP_PARAM = {"type": "string", "description": "Market cap filter", "enum": ["micro", "small", "mid", "large", "mega"]}
+LIMIT_PARAM = {"type": "integer", "description": "Number of results", "default": 20}
+
 AVAILABLE_TOOLS = [
     {
         "type": "function",
@@ -38,10 +249,7 @@ AVAILABLE_TOOLS = [
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "symbol": {
-                        "type": "string",
-                        "description": "Stock ticker symbol (e.g., AAPL, TSLA, NVDA)"
-                    },
+                    "symbol": SYMBOL_PARAM,
                     "include_options": {
                         "type": "boolean",
                         "description": "Include options chain analysis",
@@ -65,10 +273,7 @@ AVAILABLE_TOOLS = [
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "symbol": {
-                        "type": "string",
-                        "description": "Stock ticker symbol"
-                    }
+                    "symbol": SYMBOL_PARAM
                 },
                 "required": ["symbol"]
             }
@@ -82,10 +287,7 @@ AVAILABLE_TOOLS = [
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "symbol": {
-                        "type": "string",
-                        "description": "Stock ticker symbol"
-                    },
+                    "symbol": SYMBOL_PARAM,
                     "limit": {
                         "type": "integer",
                         "description": "Number of articles to fetch",
@@ -104,10 +306,7 @@ AVAILABLE_TOOLS = [
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "symbol": {
-                        "type": "string",
-                        "description": "Stock ticker symbol"
-                    },
+                    "symbol": SYMBOL_PARAM,
                     "period": {
                         "type": "string",
                         "description": "Time period: '1w' (1 week), '1mo' (1 month), '3mo', '6mo', '1y'",
@@ -126,10 +325,7 @@ AVAILABLE_TOOLS = [
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "symbol": {
-                        "type": "string",
-                        "description": "Stock ticker symbol"
-                    }
+                    "symbol": SYMBOL_PARAM
                 },
                 "required": ["symbol"]
             }
@@ -169,16 +365,8 @@ AVAILABLE_TOOLS = [
                         "description": "Minimum relative volume (e.g., 2.0 = 2x average volume)",
                         "default": 2.0
                     },
-                    "market_cap_category": {
-                        "type": "string",
-                        "description": "Filter by market cap: 'micro', 'small', 'mid', 'large', 'mega'",
-                        "enum": ["micro", "small", "mid", "large", "mega"]
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Number of results to return",
-                        "default": 20
-                    }
+                    "market_cap_category": MARKET_CAP_PARAM,
+                    "limit": LIMIT_PARAM
                 },
                 "required": []
             }
@@ -198,16 +386,8 @@ AVAILABLE_TOOLS = [
                         "enum": ["gainers", "losers"],
                         "default": "gainers"
                     },
-                    "market_cap_category": {
-                        "type": "string",
-                        "description": "Filter by market cap: 'micro', 'small', 'mid', 'large', 'mega'",
-                        "enum": ["micro", "small", "mid", "large", "mega"]
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Number of results to return",
-                        "default": 20
-                    }
+                    "market_cap_category": MARKET_CAP_PARAM,
+                    "limit": LIMIT_PARAM
                 },
                 "required": []
             }
@@ -227,16 +407,8 @@ AVAILABLE_TOOLS = [
                         "enum": ["near_high", "near_low"],
                         "default": "near_high"
                     },
-                    "market_cap_category": {
-                        "type": "string",
-                        "description": "Filter by market cap: 'micro', 'small', 'mid', 'large', 'mega'",
-                        "enum": ["micro", "small", "mid", "large", "mega"]
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Number of results to return",
-                        "default": 20
-                    }
+                    "market_cap_category": MARKET_CAP_PARAM,
+                    "limit": LIMIT_PARAM
                 },
                 "required": []
             }
@@ -260,11 +432,7 @@ AVAILABLE_TOOLS = [
                         "enum": ["change_percent", "relative_volume", "volume", "market_cap"],
                         "default": "change_percent"
                     },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Number of results to return",
-                        "default": 20
-                    }
+                    "limit": LIMIT_PARAM
                 },
                 "required": ["sector"]
             }
@@ -286,16 +454,8 @@ AVAILABLE_TOOLS = [
                         "type": "number",
                         "description": "Minimum price change % (use 0.5 for 'up today', -0.5 for 'down today')"
                     },
-                    "market_cap_category": {
-                        "type": "string",
-                        "description": "Market cap: 'micro', 'small', 'mid', 'large', 'mega'",
-                        "enum": ["micro", "small", "mid", "large", "mega"]
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Number of results (default 20)",
-                        "default": 20
-                    }
+                    "market_cap_category": MARKET_CAP_PARAM,
+                    "limit": LIMIT_PARAM
                 },
                 "required": []
             }
@@ -309,10 +469,7 @@ AVAILABLE_TOOLS = [
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "symbol": {
-                        "type": "string",
-                        "description": "Stock ticker symbol"
-                    }
+                    "symbol": SYMBOL_PARAM
                 },
                 "required": ["symbol"]
             }
@@ -332,6 +489,326 @@ AVAILABLE_TOOLS = [
     }
 ]
 
+# Serialized once at import - the tool schema never changes at runtime
+AVAILABLE_TOOLS_JSON = orjson.dumps(AVAILABLE_TOOLS)
+
+# Tool names the model may emit as XML-style tags (<tool_name>{...}</tool_name>)
+XML_TOOL_NAMES = tuple(tool["function"]["name"] for tool in AVAILABLE_TOOLS)
+XML_OPEN_TAGS = tuple(f"<{name}>" for name in XML_TOOL_NAMES)
+TOOL_NAMES = frozenset(XML_TOOL_NAMES)
+
+
+@functools.lru_cache(maxsize=1)
+def tool_tag_pattern() -> re.Pattern:
+    """Regex for complete <name>{...}</name> calls (compiled on first use)"""
+    # Any tag name matches here - callers check it against TOOL_NAMES, which
+    # is one set lookup instead of trying every name at each '<'. The
+    # arguments can't contain '<', so each match stops at the next tag
+    # instead of lazily backtracking across the whole text
+    return re.compile(
+        r'<(\w+)>'
+        r'\s*(\{[^<]*\})\s*'
+        r'</\1>'
+    )
+
+
+# Start of Kimi's special token format - everything after it is tool output
+KIMI_SECTION_MARKER = "<|tool_calls_section_begin|>"
+
+# Any Kimi section marker or XML opening tag - one scan rejects plain prose
+ANY_TOOL_MARKER = re.compile("|".join(map(re.escape, (KIMI_SECTION_MARKER, *XML_OPEN_TAGS))))
+
+# Phrases that mean the model announced a plan instead of calling a tool
+PLANNING_PHRASES = (
+    "let me search", "let me scan", "let me find", "let me look", "let me check",
+    "i'll find", "i'll search", "i'll scan", "i'll look", "i'll check",
+    "i need to", "i will search", "i will find", "i will look",
+    "searching for", "looking for", "checking for", "scanning for",
+)
+
+# Opening text is held back until this many chars arrive so a plan
+# announcement ("Let me search...") can still be suppressed
+PLANNING_WINDOW_CHARS = 160
+
+# Scanner tools whose results are already a stock list - a plain "show me" question
+# about them is answered with a local table instead of a follow-up model call
+TABULAR_TOOLS = frozenset({
+    "scan_unusual_volume",
+    "scan_top_movers",
+    "scan_breakout_candidates",
+    "scan_by_sector",
+    "search_market",
+})
+STOCK_TABLE_HEADERS = {
+    key: f"| Ticker | Price | Change | Rel Vol | {key.title()} |\n|--------|-------|--------|---------|--------|"
+    for key in ("sector", "company")
+}
+LIST_INTENT_WORDS = ("show", "find", "list", "top", "scan", "gainers", "losers")
+REASONING_WORDS = ("why", "should", "explain", "compare", "analy", "recommend", "best", "think", "opinion")
+MAX_LIST_QUESTION_CHARS = 80
+
+
+# ═══════════════════════════════════════════════════════════════
+# STREAMING TOOL-TAG SCANNER
+# ═══════════════════════════════════════════════════════════════
+
+class ToolTagScanner:
+    """
+    Incremental detector for XML-style tool calls in streamed model text
+
+    Feed it content chunks as they arrive:
+    - Text that cannot be part of a tool tag is released immediately
+    - A <tool_name>{...}</tool_name> call is returned as soon as its closing tag arrives
+    - Once Kimi's token section begins, everything from the marker on is
+      collected separately (kimi_text()) for the caller to parse at stream end
+    """
+    
+    def __init__(self, tool_names: tuple[str, ...] = XML_TOOL_NAMES):
+        self._tool_names = frozenset(tool_names)
+        self._max_tag_len = max(map(len, tool_names), default=0) + 2
+        self._open_tags = tuple(f"<{name}>" for name in tool_names)
+        self._pending = ""
+        self._current_tool: Optional[str] = None
+        self.kimi_section = False
+        self._kimi_parts: list[str] = []
+        self.call_count = 0
+    
+    def feed(self, text: str) -> tuple[str, list[dict]]:
+        """
+        Scan the next chunk of model text
+        
+        Returns:
+            (text_safe_to_show, tool_calls_completed_by_this_chunk)
+        """
+        # Everything after the Kimi section marker is tool output
+        if self.kimi_section:
+            self._kimi_parts.append(text)
+            return "", []
+        
+        self._pending += text
+        released = []
+        tool_calls = []
+        
+        while self._pending and not self.kimi_section:
+            # Inside a tool tag - wait for the closing tag
+            if self._current_tool:
+                close_tag = f"</{self._current_tool}>"
+                end = self._pending.find(close_tag)
+                if end == -1:
+                    break
+                
+                json_str = self._pending[:end].strip()
+                if json_str.startswith("{") and json_str.endswith("}"):
+                    try:
+                        arguments = orjson.loads(json_str)
+                    except orjson.JSONDecodeError:
+                        logger.warning("Failed to parse tool arguments: %s", json_str[:100])
+                        arguments = {}
+                    
+                    tool_calls.append({
+                        "id": f"xml_call_{self._current_tool}_{self.call_count}",
+                        "name": self._current_tool,
+                        "arguments": arguments
+                    })
+                    self.call_count += 1
+                else:
+                    # Not a tool call after all - show it as written
+                    released.append(f"<{self._current_tool}>{self._pending[:end + len(close_tag)]}")
+                
+                self._pending = self._pending[end + len(close_tag):]
+                self._current_tool = None
+                continue
+            
+            start = self._pending.find("<")
+            if start == -1:
+                released.append(self._pending)
+                self._pending = ""
+                break
+            
+            released.append(self._pending[:start])
+            rest = self._pending = self._pending[start:]
+            
+            if rest.startswith(KIMI_SECTION_MARKER):
+                self.kimi_section = True
+                self._kimi_parts.append(rest)
+                self._pending = ""
+                break
+            
+            close = rest.find(">", 1, self._max_tag_len)
+            if close != -1 and rest[1:close] in self._tool_names:
+                self._current_tool = rest[1:close]
+                self._pending = rest[close + 1:]
+                continue
+            
+            # Could still become a tag once more text arrives
+            if KIMI_SECTION_MARKER.startswith(rest) or any(tag.startswith(rest) for tag in self._open_tags):
+                break
+            
+            released.append("<")
+            self._pending = rest[1:]
+        
+        return "".join(released), tool_calls
+    
+    def kimi_text(self) -> str:
+        """Kimi's token section (marker included), or "" if the model never opened one"""
+        return "".join(self._kimi_parts)
+    
+    def flush(self) -> str:
+        """Release held text once the stream ends (unterminated tags are shown as written)"""
+        if self.kimi_section:
+            return ""
+        
+        text = self._pending
+        if self._current_tool:
+            text = f"<{self._current_tool}>{text}"
+        
+        self._pending = ""
+        self._current_tool = None
+        return text
+
+
+# ═══════════════════════════════════════════════════════════════
+# TOOL EXECUTION POOL
+# ═══════════════════════════════════════════════════════════════
+
+# Shared by every ChatService - tools run on warm worker threads instead of a
+# new thread per call, and bursts queue instead of spawning unbounded threads
+TOOL_POOL = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 4),
+    thread_name_prefix="chat-tool",
+)
+atexit.register(TOOL_POOL.shutdown, wait=False, cancel_futures=True)
+
+
+# ═══════════════════════════════════════════════════════════════
+# TOOL RESULT CACHE
+# ═══════════════════════════════════════════════════════════════
+
+# Seconds a tool result stays fresh (tools not listed are never cached)
+TOOL_CACHE_TTL = {
+    "get_market_overview": 30,
+    "scan_unusual_volume": 15,
+    "scan_top_movers": 15,
+    "scan_breakout_candidates": 15,
+    "scan_by_sector": 15,
+    "search_market": 15,
+    "get_stock_quote": 5,
+    "get_stock_news": 300,
+    "get_stock_analysis": 60,
+}
+
+# Most tool results held at once (oldest dropped first)
+TOOL_CACHE_MAX_ENTRIES = 512
+
+
+class CachedToolExecutor:
+    """
+    Tool executor wrapper with a short-lived in-memory cache
+    
+    Repeated questions ("top gainers?") are answered from memory instead of
+    re-running the scanners. Concurrent calls for the same tool + arguments
+    wait for the first one rather than all hitting the backend.
+    """
+    
+    def __init__(self, executor, ttls: Optional[dict[str, int]] = None):
+        self.executor = executor
+        self.ttls = TOOL_CACHE_TTL if ttls is None else ttls
+        self._cache = SimpleCache(max_entries=TOOL_CACHE_MAX_ENTRIES)
+        self._inflight: dict[str, threading.Lock] = {}
+        self._inflight_lock = threading.Lock()
+    
+    def _cache_key(self, tool_name: str, arguments: dict) -> str:
+        """Key on tool name + canonicalized arguments"""
+        args_json = orjson.dumps(arguments, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        return f"tool:{tool_name}:{hashlib.blake2b(args_json, digest_size=8).hexdigest()}"
+    
+    def __call__(self, tool_name: str, arguments: dict) -> Any:
+        ttl = self.ttls.get(tool_name)
+        if not ttl:
+            return self.executor(tool_name, arguments)
+        
+        key = self._cache_key(tool_name, arguments)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.info("[CHAT] Tool cache hit: %s", tool_name)
+            return cached
+        
+        with self._inflight_lock:
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            # Another chat may have filled the cache while we waited
+            cached = self._cache.get(key)
+            if cached is not None:
+                logger.info("[CHAT] Tool cache hit: %s", tool_name)
+                return cached
+            
+            try:
+                result = self.executor(tool_name, arguments)
+                
+                # Don't cache failures - the next call should retry
+                if not (isinstance(result, dict) and "error" in result):
+                    self._cache.set(key, result, ttl_seconds=ttl)
+                return result
+            finally:
+                with self._inflight_lock:
+                    self._inflight.pop(key, None)
+
+
+# Seconds a finished chat answer can be replayed for the same conversation
+RESPONSE_CACHE_TTL = 60
+RESPONSE_CACHE_MAX_ENTRIES = 256
+
+
+# Seconds a follow-up summary of tool results can be reused
+SUMMARY_CACHE_TTL = 45
+SUMMARY_CACHE_MAX_ENTRIES = 256
+
+
+def replay_ttl(ttl: int, tool_names: Iterable[str]) -> int:
+    """
+    Cap a replay cache TTL at the freshness of the tools behind the answer
+    
+    A quote-backed answer is replayed for 5s at most; tools that are never
+    cached give 0 (don't store).
+    """
+    return min([ttl, *(TOOL_CACHE_TTL.get(name, 0) for name in tool_names)])
+
+
+def normalize_text(text: Any) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation for cache keys"""
+    return " ".join(str(text).lower().split()).rstrip("?!. ")
+
+
+def response_cache_key(model: str, messages: list[dict], use_tools: bool) -> str:
+    """
+    Key a conversation on the model and its normalized text
+    
+    Case, whitespace and trailing punctuation are ignored so "Top gainers?"
+    and "top gainers" share an entry.
+    """
+    parts = [(m.get("role", ""), normalize_text(m.get("content", ""))) for m in messages]
+    digest = hashlib.blake2b(orjson.dumps([model, use_tools, parts]), digest_size=16).hexdigest()
+    return f"chat:{digest}"
+
+
+def has_tool_errors(tool_results: list[dict]) -> bool:
+    """True if any tool returned an error result"""
+    return any(isinstance(tr["result"], dict) and "error" in tr["result"] for tr in tool_results)
+
+
+def summary_cache_key(model: str, user_question: str, results_summary: str) -> str:
+    """
+    Key a follow-up summary on the model, the question and the exact tool data it summarized
+    
+    results_summary is the encoded data sent to the model (tools, arguments
+    and results), so a hit is only possible when the numbers are unchanged.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(orjson.dumps([model, normalize_text(user_question)]))
+    digest.update(results_summary.encode("utf-8"))
+    return f"summary:{digest.hexdigest()}"
+
 
 # ═══════════════════════════════════════════════════════════════
 # SYSTEM PROMPT
@@ -339,80 +816,90 @@ AVAILABLE_TOOLS = [
 
 SYSTEM_PROMPT = """You are **AlphaBot**, a financial AI that provides real-time market data.
 
-## ABSOLUTE RULES (VIOLATION = FAILURE)
-
-### RULE 1: NO PLANNING OUT LOUD
-- **FORBIDDEN PHRASES** (NEVER say these):
-  - "Let me search..."
-  - "I'll find..."
-  - "Let me look..."
-  - "I need to scan..."
-  - "I'll check..."
-- **JUST CALL THE TOOL DIRECTLY**. No preamble. No explanation.
-
-### RULE 2: TOOL-FIRST (NO EXCEPTIONS)
-- User asks about stocks? → Call `search_market` or `scan_top_movers` IMMEDIATELY
-- User asks about a price? → Call `get_stock_quote` IMMEDIATELY  
-- User asks about news? → Call `get_stock_news` or `get_market_news` IMMEDIATELY
-- **DO NOT** output any text before calling a tool
-
-### RULE 3: COMPLETE RESPONSES
-After receiving tool data, you MUST provide:
-1. **Data Table**: Markdown format with Symbol | Price | Change | Volume
-2. **1-2 sentences of insight**
-3. **Follow-up question** (MANDATORY - end every response with a question)
-
-### RULE 4: NO HALLUCINATIONS
-- NEVER guess prices, volumes, or technical levels
-- ALWAYS use tool data for any numbers you quote
-- If `sma_20` = $25.37 in tool data, you say $25.37 (not $1.45)
-
-### RULE 5: CHARTS
-To show a chart: `[CHART:SYMBOL:1d:3mo:sma_20,volume]`
-You CAN display charts. Never say you can't.
-
-## EXAMPLES
-
-**WRONG** (announces plan):
-User: "Find biotech stocks with catalysts"
-Bot: "I'll find biotech stocks with recent catalysts. Let me scan for biotech companies..."
-[FAILS - announced plan instead of calling tool]
+## RULES (VIOLATION = FAILURE)
+1. **No planning out loud.** Never say "Let me search...", "I'll find...", "Let me look...", "I need to scan...", "I'll check...". Call the tool directly - no preamble.
+2. **Tool first.** Stocks → `search_market` or `scan_top_movers`. Price → `get_stock_quote`. News → `get_stock_news` or `get_market_news`. Never output text before the tool call.
+3. **Complete responses.** After tool data, give a Markdown table (Symbol | Price | Change | Volume), 1-2 sentences of insight, and end with a follow-up question (mandatory).
+4. **No hallucinations.** Never guess prices, volumes or technical levels - quote tool data exactly (if `sma_20` = $25.37, say $25.37).
+5. **Charts.** Show one with `[CHART:SYMBOL:1d:3mo:sma_20,volume]`. You CAN display charts.
+
+## FILTERS
+- Start broad with minimal filters. If 0 results, broaden immediately.
+- Never use `min_rvol` (relative volume data is unreliable). For "volume", sort by it - don't filter.
+- Sector requests: filter by sector + `min_change: 0.5`, nothing else.
+- "Unusual volume": use `scan_unusual_volume` or top movers.
 
-**CORRECT** (calls tool immediately):
+## EXAMPLE
 User: "Find biotech stocks with catalysts"
-Bot: [CALLS search_market with sector="Healthcare"]
-[After receiving data]
-"Here are biotech stocks showing momentum today:
+Call `search_market` with sector="Healthcare", then answer:
 
 | Ticker | Price | Change | Volume | Sector |
 |--------|-------|--------|--------|--------|
 | **MRNA** | $45.23 | +8.2% | 12.5M | Healthcare |
-| **BNTX** | $112.45 | +5.1% | 3.2M | Healthcare |
 
 **MRNA** is leading the sector on positive clinical trial news.
 
-Would you like me to show the chart for any of these, or check the recent headlines?"
-
-## AVAILABLE TOOLS
-- `search_market`: Find stocks by filters (sector, price, volume, market_cap)
-- `scan_top_movers`: Get gainers/losers
-- `scan_unusual_volume`: Find volume spikes  
-- `scan_by_sector`: Stocks in a sector
-- `get_stock_quote`: Real-time price
-- `get_stock_analysis`: Full analysis with technicals
-- `get_stock_news`: Recent headlines
-- `get_market_news`: General market news
-- `get_insider_transactions`: Insider trades
-
-## CRITICAL: FILTER USAGE
-- **START BROAD**: Use minimal filters. 
-- **NEVER use min_rvol** - we don't have reliable relative volume data.
-- **If user says "volume"**: Sort by volume, don't filter by it.
-- **If sector requested**: Just filter by sector + min_change: 0.5. That's it.
-- **If "unusual volume" requested**: Use scan_unusual_volume tool OR just get top movers.
-- **If 0 results**: Broaden search immediately.
+Would you like me to show the chart for any of these, or check the recent headlines?
 """
 
+# The system message is identical on every turn - serialize it once, and mark
+# it cacheable so providers that support prompt caching can skip its prefill
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+}
+SYSTEM_MESSAGE_JSON = orjson.dumps(SYSTEM_MESSAGE)
+
+
+# (connect, read) seconds - fail fast if OpenRouter is unreachable, but give
+# long generations time to stream
+API_TIMEOUT = (5, 120)
+
+# Streamed completions must arrive uncompressed - gzip makes urllib3 buffer
+# SSE frames until it has a decodable block
+STREAM_HEADERS = {"Accept": "text/event-stream", "Accept-Encoding": "identity"}
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def openrouter_session() -> requests.Session:
+    """
+    Pooled HTTP session for OpenRouter, shared by every ChatService
+    
+    Created on first use; keeps TLS connections warm across chat turns and
+    service instances instead of handshaking on every call.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(
+                    pool_connections=16,
+                    pool_maxsize=32,
+                    # Only retry when no generation can have started: connection
+                    # failures and the listed statuses. read=0 - a POST that timed out
+                    # mid-generation is never re-sent (it would be billed twice), and
+                    # Retry-After is ignored so a 429 can't park the request thread
+                    max_retries=Retry(
+                        total=2,
+                        connect=2,
+                        read=0,
+                        other=0,
+                        status=2,
+                        backoff_factor=0.2,
+                        status_forcelist=[429, 502, 503, 504],
+                        allowed_methods=frozenset({"POST"}),
+                        respect_retry_after_header=False,
+                        raise_on_status=False,
+                    ),
+                ))
+                session.headers["Content-Type"] = "application/json"
+                _session = session
+    return _session
+
 
 class ChatService:
     """Service for streaming chat with tool calling"""
@@ -421,7 +908,47 @@ class ChatService:
         self.api_key = OPENROUTER_API_KEY or os.getenv("OPENROUTER_API_KEY")
         self.api_base = OPENROUTER_BASE_URL
         self.model = KIMI_MODEL
+        self._completions_url = f"{self.api_base}/chat/completions"
+        # Constant start of every request body, one per stream setting
+        self._body_prefixes = {
+            stream: b'{"model":' + orjson.dumps(self.model) + (b',"stream":true' if stream else b',"stream":false') + b',"temperature":0.7'
+            for stream in (True, False)
+        }
         self.tool_executor = tool_executor
+        # Bounded - nearly every conversation key is written once and never read again
+        self._response_cache = SimpleCache(max_entries=RESPONSE_CACHE_MAX_ENTRIES)  # Finished event streams, keyed by response_cache_key
+        self._summary_cache = SimpleCache(max_entries=SUMMARY_CACHE_MAX_ENTRIES)  # Follow-up summaries, keyed by summary_cache_key
+        
+        # Per-instance auth; the connection pool itself is shared (openrouter_session)
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "HTTP-Referer": OPENROUTER_APP_URL,
+            "X-Title": OPENROUTER_APP_NAME,
+        }
+        self._stream_headers = {**self._headers, **STREAM_HEADERS}
+        
+        # Open the TLS connection now so the first chat turn doesn't pay the handshake
+        if self.api_key:
+            threading.Thread(target=self._prewarm, name="openrouter-prewarm", daemon=True).start()
+    
+    def _prewarm(self):
+        """Leave a warm keep-alive connection to OpenRouter in the shared pool"""
+        try:
+            openrouter_session().head(self.api_base, timeout=5)
+        except requests.RequestException as e:
+            logger.debug("[CHAT] Connection prewarm failed: %s", e)
+    
+    def _format_stock_row(self, stock: dict, name_key: str) -> str:
+        """One markdown table row for _format_stocks_table"""
+        # Scanner tools use the short change_pct / rvol keys
+        price = stock.get("price") or 0
+        change = stock.get("change_percent", stock.get("change_pct")) or 0
+        rvol = stock.get("relative_volume", stock.get("rvol")) or 0
+        
+        change_str = f"+{change:.1f}%" if change > 0 else f"{change:.1f}%"
+        rvol_str = f"{rvol:.1f}x" if rvol else "N/A"
+        
+        return f"| **{stock.get('symbol', 'N/A')}** | ${price:.2f} | {change_str} | {rvol_str} | {stock.get(name_key) or 'N/A'} |"
     
     def _format_stocks_table(self, data: dict) -> str:
         """Fallback method to format stock data into a markdown table"""
@@ -429,42 +956,42 @@ class ChatService:
         if not stocks:
             return "No stocks found matching your criteria.\n\nWould you like to try different filters?"
         
-        # Build markdown table
-        lines = [
-            "| Ticker | Price | Change | Rel Vol | Sector |",
-            "|--------|-------|--------|---------|--------|"
-        ]
+        # Scanner tools return company names, search_market returns sectors
+        name_key = "sector" if any(stock.get("sector") for stock in stocks) else "company"
+        count = data.get("count", len(stocks))
         
-        for stock in stocks[:15]:  # Limit to 15 rows
-            symbol = stock.get("symbol", "N/A")
-            price = stock.get("price", 0)
-            change = stock.get("change_percent", 0)
-            rvol = stock.get("relative_volume", 0)
-            sector = stock.get("sector", "N/A") or "N/A"
-            
-            change_str = f"+{change:.1f}%" if change > 0 else f"{change:.1f}%"
-            rvol_str = f"{rvol:.1f}x" if rvol else "N/A"
-            
-            lines.append(f"| **{symbol}** | ${price:.2f} | {change_str} | {rvol_str} | {sector} |")
+        # One join over header, rows (limit 15) and summary
+        return "\n".join((
+            STOCK_TABLE_HEADERS[name_key],
+            *(self._format_stock_row(stock, name_key) for stock in stocks[:15]),
+            "",
+            f"Found {count} stocks matching your criteria.",
+            "",
+            "Would you like more details on any of these tickers?",
+        ))
+    
+    def _can_format_locally(self, user_question: str, tool_results: list[dict]) -> bool:
+        """
+        True when a single scanner result answers a plain "show me" question
         
-        table = "\n".join(lines)
+        Those only need a table, so the follow-up summarization call is skipped.
+        """
+        if len(tool_results) != 1 or tool_results[0]["tool"] not in TABULAR_TOOLS:
+            return False
         
-        # Add summary
-        count = data.get("count", len(stocks))
-        table += f"\n\nFound {count} stocks matching your criteria."
-        table += "\n\nWould you like more details on any of these tickers?"
+        result = tool_results[0]["result"]
+        if not isinstance(result, dict) or "error" in result or "stocks" not in result:
+            return False
         
-        return table
+        question = user_question.lower()
+        return (
+            len(question) <= MAX_LIST_QUESTION_CHARS
+            and any(word in question for word in LIST_INTENT_WORDS)
+            and not any(word in question for word in REASONING_WORDS)
+        )
     
-    # Regex pattern to detect XML-style tool calls in text
-    # Matches: <tool_name> {...json...} </tool_name>
-    TOOL_TAG_PATTERN = re.compile(
-        r'<(get_stock_analysis|get_stock_quote|get_stock_news|get_options_flow|get_market_news|'
-        r'scan_unusual_volume|scan_top_movers|scan_breakout_candidates|scan_by_sector|search_market|get_market_overview)>'
-        r'\s*(\{.*?\})\s*'
-        r'</\1>',
-        re.DOTALL
-    )
+    # Bound regex work on runaway model output
+    MAX_TOOL_SCAN_CHARS = 200_000
     
     # Pattern for Kimi's special token format:
     # <|tool_calls_section_begin|><|tool_call_begin|>tool {"count": 15, "stocks": [...]}
@@ -487,29 +1014,41 @@ class ChatService:
         embedded_data = None
         cleaned_text = text
         
+        if len(text) > self.MAX_TOOL_SCAN_CHARS:
+            logger.warning("[CHAT] Skipping tool scan on oversized text (%d chars)", len(text))
+            return cleaned_text, tool_calls, embedded_data
+        
+        # Fast exit for plain prose (the common case) - one literal-alternation
+        # scan is far cheaper than running the extraction regexes
+        if "<" not in text or not ANY_TOOL_MARKER.search(text):
+            return cleaned_text, tool_calls, embedded_data
+        
         # Check for Kimi's special token format first:
         # <|tool_calls_section_begin|><|tool_call_begin|>tool {"count": 15, "filters": {...}, "stocks": [...]}
-        kimi_match = self.KIMI_TOOL_TOKEN_PATTERN.search(text)
+        kimi_match = self.KIMI_TOOL_TOKEN_PATTERN.search(text) if KIMI_SECTION_MARKER in text else None
         if kimi_match:
             json_str = kimi_match.group(1)
-            logger.info(f"[CHAT] Detected Kimi token format tool output ({len(json_str)} chars)")
+            logger.info("[CHAT] Detected Kimi token format tool output (%d chars)", len(json_str))
             
-            # Try to parse the JSON - it might be incomplete or malformed
+            # Try to parse the JSON - it might be followed by more Kimi tokens,
+            # or be cut off mid-object
+            json_str = json_str.strip()
             try:
-                # The JSON might not have a closing brace, try to fix it
-                json_str = json_str.strip()
-                if not json_str.endswith('}'):
-                    # Count braces to find where to close
-                    open_braces = json_str.count('{')
-                    close_braces = json_str.count('}')
-                    json_str += '}' * (open_braces - close_braces)
-                
-                parsed_data = json.loads(json_str)
-                
+                # raw_decode stops at the end of the first complete object
+                parsed_data, _ = JSON_DECODER.raw_decode(json_str)
+            except ValueError:
+                try:
+                    parsed_data = orjson.loads(close_json(json_str))
+                    logger.info("[CHAT] Repaired truncated Kimi token JSON")
+                except orjson.JSONDecodeError as e:
+                    logger.warning("[CHAT] Failed to parse Kimi token JSON: %s", e)
+                    parsed_data = None
+            
+            if isinstance(parsed_data, dict):
                 # Check if this contains actual data (stocks, etc) or just parameters
                 if 'stocks' in parsed_data:
                     # The model already "executed" the tool and included results
-                    logger.info(f"[CHAT] Found embedded results with {len(parsed_data.get('stocks', []))} stocks")
+                    logger.info("[CHAT] Found embedded results with %d stocks", len(parsed_data.get("stocks", [])))
                     embedded_data = parsed_data
                 else:
                     # Just parameters - need to execute
@@ -518,19 +1057,6 @@ class ChatService:
                         "name": "search_market",  # Default to search_market
                         "arguments": parsed_data.get("filters", parsed_data)
                     })
-                    
-            except json.JSONDecodeError as e:
-                logger.warning(f"[CHAT] Failed to parse Kimi token JSON: {e}")
-                # Try to extract just the stocks array if present
-                stocks_match = re.search(r'"stocks"\s*:\s*(\[.*\])', json_str, re.DOTALL)
-                if stocks_match:
-                    try:
-                        stocks = json.loads(stocks_match.group(1))
-                        embedded_data = {"stocks": stocks}
-                        logger.info(f"[CHAT] Extracted {len(stocks)} stocks from partial JSON")
-                    except Exception as parse_err:
-                        logger.debug(f"Failed to parse stocks from Kimi token JSON: {parse_err}")
-                        pass
             
             # Remove the Kimi token format from text
             # Find where the token section starts
@@ -540,15 +1066,17 @@ class ChatService:
             
             return cleaned_text, tool_calls, embedded_data
         
-        # Fall back to XML-style pattern
-        for match in self.TOOL_TAG_PATTERN.finditer(text):
-            tool_name = match.group(1)
-            json_str = match.group(2)
+        # Fall back to XML-style pattern - one pass collects each call and
+        # strips its tag
+        def _collect_and_strip(match: re.Match) -> str:
+            tool_name, json_str = match.groups()
+            if tool_name not in TOOL_NAMES:
+                return match.group(0)
             
             try:
-                arguments = json.loads(json_str)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse tool arguments: {json_str[:100]}")
+                arguments = orjson.loads(json_str)
+            except orjson.JSONDecodeError:
+                logger.warning("Failed to parse tool arguments: %s", json_str[:100])
                 arguments = {}
             
             tool_calls.append({
@@ -556,18 +1084,145 @@ class ChatService:
                 "name": tool_name,
                 "arguments": arguments
             })
+            return ""
         
-        # Remove the tool tags from text
-        cleaned_text = self.TOOL_TAG_PATTERN.sub('', cleaned_text)
+        cleaned_text = tool_tag_pattern().sub(_collect_and_strip, text)
         # Clean up extra whitespace
-        cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
+        cleaned_text = ' '.join(cleaned_text.split())
         
         return cleaned_text, tool_calls, embedded_data
     
+    def _detect_planning_phrase(self, text: str) -> Optional[str]:
+        """Return the first plan-announcement phrase found in text, if any"""
+        text_lower = text.lower()
+        return next((p for p in PLANNING_PHRASES if p in text_lower), None)
+    
+    def _last_user_content(self, messages: list[dict]) -> str:
+        """
+        The most recent user message's text ("" if there is none)
+        
+        Always a str: OpenAI-style content part lists are reduced to their
+        text parts, and None or anything else becomes "".
+        """
+        content = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "")
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            return " ".join(
+                part["text"] for part in content
+                if isinstance(part, dict) and part.get("type") == "text" and isinstance(part.get("text"), str)
+            )
+        return ""
+    
+    def _fallback_tool_for(self, user_question: str) -> tuple[str, dict]:
+        """Pick the tool to force when the model announced a plan but didn't call one"""
+        user_question = user_question.lower()
+        
+        # Less restrictive searches - just get data, let Kimi analyze
+        if any(kw in user_question for kw in ["biotech", "healthcare", "pharma", "drug"]):
+            return "scan_by_sector", {"sector": "Healthcare", "sort_by": "change_percent", "limit": 20}
+        elif any(kw in user_question for kw in ["tech", "software", "ai", "semiconductor"]):
+            return "scan_by_sector", {"sector": "Technology", "sort_by": "change_percent", "limit": 20}
+        elif any(kw in user_question for kw in ["energy", "oil", "gas"]):
+            return "scan_by_sector", {"sector": "Energy", "sort_by": "change_percent", "limit": 20}
+        elif any(kw in user_question for kw in ["finance", "bank", "financial"]):
+            return "scan_by_sector", {"sector": "Financial Services", "sort_by": "change_percent", "limit": 20}
+        elif any(kw in user_question for kw in ["gainer", "winner", "top", "best", "hot", "return"]):
+            return "scan_top_movers", {"direction": "gainers", "limit": 20}
+        elif any(kw in user_question for kw in ["loser", "worst", "down", "falling"]):
+            return "scan_top_movers", {"direction": "losers", "limit": 20}
+        elif any(kw in user_question for kw in ["volume", "unusual", "spike", "active"]):
+            return "scan_unusual_volume", {"min_rvol": 1.5, "limit": 20}
+        elif any(kw in user_question for kw in ["breakout", "high", "52"]):
+            return "scan_breakout_candidates", {"type": "near_high", "limit": 20}
+        
+        # Default: top movers
+        return "scan_top_movers", {"direction": "gainers", "limit": 20}
+    
+    def _start_tool(self, tool_name: str, tool_args: dict) -> Future:
+        """Run a tool on the shared tool pool"""
+        return TOOL_POOL.submit(self.tool_executor, tool_name, tool_args)
+    
+    def _take_early_tool(self, early_tools: dict[int, tuple], tool_call: dict) -> Future:
+        """Reuse the run started while this call's arguments streamed in, or start it now"""
+        for idx, (name, arguments, future) in early_tools.items():
+            if name == tool_call["name"] and arguments == tool_call["arguments"]:
+                del early_tools[idx]
+                return future
+        return self._start_tool(tool_call["name"], tool_call["arguments"])
+    
+    def _wait_for_tool(self, tool_name: str, future: Future) -> Generator[dict, None, Any]:
+        """
+        Wait for a tool started with _start_tool
+        
+        Yields "thinking" heartbeats every 2 seconds to keep the connection
+        alive and returns the tool result (use with `yield from`).
+        """
+        start_wait = time.time()
+        # wait() rather than result(timeout=...): on Python 3.11+ a tool that itself
+        # raises TimeoutError would be indistinguishable from one still running
+        while not wait_for_futures([future], timeout=2.0).done:
+            # Tool still running, yield thinking to keep connection alive
+            logger.info("[CHAT] Tool %s still running...", tool_name)
+            yield {"type": "thinking", "content": f"Running {tool_name}..."}
+            
+            # Timeout after 60 seconds
+            if time.time() - start_wait > 60:
+                logger.error("[CHAT] Tool %s timed out", tool_name)
+                # Don't let a call that is still queued take a pool slot later
+                future.cancel()
+                return {"error": "Tool execution timed out"}
+        
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error("[CHAT] Tool error: %s", e)
+            return {"error": str(e)}
+    
     def chat_stream(
         self,
         messages: list[dict],
         use_tools: bool = True,
+    ) -> Generator[dict, None, None]:
+        """
+        Stream chat response, replaying a recent identical conversation from cache
+        
+        Only clean runs (finished with "done", no errors) are cached, and never
+        for longer than the data from the tools they used stays fresh.
+        """
+        try:
+            key = response_cache_key(self.model, messages, use_tools)
+        except Exception as e:
+            # Malformed messages: skip the cache and let _chat_stream report it
+            logger.warning("[CHAT] Not caching response: %s", e)
+            key = None
+        
+        cached = self._response_cache.get(key) if key else None
+        if cached is not None:
+            logger.info("[CHAT] Response cache hit")
+            yield from cached
+            return
+        
+        events = []
+        for event in self._chat_stream(messages, use_tools):
+            events.append(event)
+            yield event
+        
+        if key is None or not events or events[-1]["type"] != "done" or not events[-1]["content"] or any(
+            e["type"] == "error"
+            or (e["type"] == "tool_result" and isinstance(e.get("result"), dict) and "error" in e["result"])
+            for e in events
+        ):
+            return
+        
+        ttl = replay_ttl(RESPONSE_CACHE_TTL, (e["name"] for e in events if e["type"] == "tool_call"))
+        if ttl > 0:
+            self._response_cache.set(key, events, ttl_seconds=ttl)
+    
+    def _chat_stream(
+        self,
+        messages: list[dict],
+        use_tools: bool = True,
     ) -> Generator[dict, None, None]:
         """
         Stream chat response with tool calling support
@@ -589,136 +1244,166 @@ class ChatService:
             yield {"type": "error", "content": "API key not configured"}
             return
         
-        # Add system prompt
-        full_messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            *messages
-        ]
-        
         try:
+            # Add system prompt
+            full_messages = [SYSTEM_MESSAGE, *messages]
+            user_question = self._last_user_content(messages)
+            
             # Initial request with tools
             response = self._call_api(full_messages, stream=True, tools=AVAILABLE_TOOLS if use_tools else None)
             
             full_response = ""
             tool_calls = []
-            text_buffer = ""  # Buffer to accumulate text for XML tool detection
             xml_tool_calls = []  # Track XML-style tool calls separately
+            running_tools = []  # XML tool calls already executing: (tool_call, future)
+            early_tools = {}  # API tool calls started as soon as their arguments closed: index -> (name, arguments, future)
+            streamed_names = {}  # Tool name per streamed tool-call index
+            streamed_args = {}  # Argument fragments per streamed tool-call index
+            unknown_tools = []  # Names of rejected tool calls (not in TOOL_NAMES)
+            scanner = ToolTagScanner()
+            held_text = ""  # Opening text held back until we know it isn't a plan announcement
+            streaming_text = False  # True once text is going straight to the client
+            streamed_parts = []
             
-            for chunk in self._parse_stream(response):
+            for chunk in self._parse_stream(response, text_only=not use_tools):
                 if chunk.get("type") == "content":
-                    text_buffer += chunk["content"]
+                    safe_text, completed_calls = scanner.feed(chunk["content"])
+                    
+                    # Start XML tool calls the moment their closing tag arrives,
+                    # so tools run while the model is still generating
+                    for tc in completed_calls:
+                        if not xml_tool_calls:
+                            yield {"type": "thinking", "content": "Searching market data..."}
+                        xml_tool_calls.append(tc)
+                        logger.info("[CHAT] Executing tool: %s", tc["name"])
+                        yield {"type": "tool_call", "name": tc["name"], "arguments": tc["arguments"]}
+                        running_tools.append((tc, self._start_tool(tc["name"], tc["arguments"])))
                     
+                    # Once a tool is called the follow-up call presents the results
+                    if xml_tool_calls or not safe_text:
+                        continue
+                    
+                    if streaming_text:
+                        streamed_parts.append(safe_text)
+                        yield {"type": "text", "content": safe_text}
+                    else:
+                        held_text += safe_text
+                        if len(held_text) >= PLANNING_WINDOW_CHARS and not self._detect_planning_phrase(held_text):
+                            streaming_text = True
+                            streamed_parts.append(held_text)
+                            yield {"type": "text", "content": held_text}
+                            held_text = ""
+                    
+                elif chunk.get("type") == "tool_call_delta":
+                    idx = chunk["index"]
+                    # The tool name arrives first - tell the client while the arguments stream in
+                    if chunk["name"]:
+                        streamed_names[idx] = chunk["name"]
+                        if chunk["name"] in TOOL_NAMES:
+                            yield {"type": "thinking", "content": f"Preparing {chunk['name']}..."}
+                    
+                    # Once the arguments form a complete object, start the tool so it
+                    # runs while the model finishes the rest of its response. Not once
+                    # XML calls exist - that path ignores API calls. A started tool
+                    # can't be stopped: one no final call matches runs to completion
+                    # on TOOL_POOL and its result is discarded
+                    arguments_delta = chunk["arguments_delta"]
+                    if arguments_delta:
+                        streamed_args.setdefault(idx, []).append(arguments_delta)
+                        if "}" in arguments_delta and idx not in early_tools and self.tool_executor and not xml_tool_calls:
+                            name = streamed_names.get(idx)
+                            arguments = complete_tool_arguments("".join(streamed_args[idx]))
+                            if name in TOOL_NAMES and arguments is not None:
+                                early_tools[idx] = (name, arguments, self._start_tool(name, arguments))
+                
                 elif chunk.get("type") == "tool_call":
                     # Validate tool call before adding
                     tool_name = chunk.get("name")
                     tool_args = chunk.get("arguments", {})
                     
-                    if not tool_name or not isinstance(tool_name, str):
+                    if tool_name not in TOOL_NAMES:
+                        logger.warning("[CHAT] Ignoring call to unknown tool: %r", tool_name)
+                        unknown_tools.append(str(tool_name))
                         continue
                     
                     if not isinstance(tool_args, dict):
                         tool_args = {}
                     
                     tool_calls.append({
-                        "id": chunk.get("id", f"call_{tool_name}"),
+                        "id": chunk["id"],  # Always set - _drain_pending fills in missing ids
                         "name": tool_name,
                         "arguments": tool_args
                     })
             
-            # Check for XML-style tool calls in accumulated text
-            if text_buffer:
-                logger.info(f"[CHAT] Checking text buffer ({len(text_buffer)} chars) for tool calls...")
+            remaining_text = scanner.flush()
+            if remaining_text and not xml_tool_calls:
+                if streaming_text:
+                    streamed_parts.append(remaining_text)
+                    yield {"type": "text", "content": remaining_text}
+                else:
+                    held_text += remaining_text
+            
+            embedded_data = None
+            
+            # Kimi's token format arrives as one section at the end of the text
+            if scanner.kimi_section:
+                text_buffer = scanner.kimi_text()
+                logger.info("[CHAT] Checking Kimi token section (%d chars) for tool calls...", len(text_buffer))
+                _, kimi_tool_calls, embedded_data = self._extract_xml_tool_calls(text_buffer)
+                if kimi_tool_calls and not xml_tool_calls:
+                    yield {"type": "thinking", "content": "Searching market data..."}
+                for tc in kimi_tool_calls:
+                    xml_tool_calls.append(tc)
+                    logger.info("[CHAT] Executing tool: %s", tc["name"])
+                    yield {"type": "tool_call", "name": tc["name"], "arguments": tc["arguments"]}
+                    running_tools.append((tc, self._start_tool(tc["name"], tc["arguments"])))
+            
+            # FALLBACK: If model said "Let me search" but didn't call a tool, force it
+            if not streaming_text and held_text:
+                logger.info("[CHAT] Checking for planning phrases in: '%.100s...'", held_text)
+            detected_phrase = None if streaming_text else self._detect_planning_phrase(held_text)
+            if detected_phrase and not xml_tool_calls and not embedded_data and not tool_calls:
+                logger.warning("[CHAT] ⚠️ Model announced plan ('%s') but didn't call tool - FORCING FALLBACK", detected_phrase)
                 
-                cleaned_text, extracted_xml_tools, embedded_data = self._extract_xml_tool_calls(text_buffer)
-                xml_tool_calls = extracted_xml_tools  # Update the outer variable
+                forced_tool, forced_args = self._fallback_tool_for(user_question)
+                forced_call = {
+                    "id": f"forced_{forced_tool}",
+                    "name": forced_tool,
+                    "arguments": forced_args
+                }
+                logger.info("[CHAT] 🔧 FORCING TOOL: %s with args: %s", forced_tool, forced_args)
                 
-                # FALLBACK: If model said "Let me search" but didn't call a tool, force it
-                planning_phrases = [
-                    "let me search", "let me scan", "let me find", "let me look", "let me check",
-                    "i'll find", "i'll search", "i'll scan", "i'll look", "i'll check",
-                    "i need to", "i will search", "i will find", "i will look",
-                    "searching for", "looking for", "checking for", "scanning for"
-                ]
-                text_lower = text_buffer.lower()
-                logger.info(f"[CHAT] Checking for planning phrases in: '{text_lower[:100]}...'")
+                # Don't yield the planning text - it's useless
+                held_text = ""
+                yield {"type": "thinking", "content": "Searching market data..."}
+                xml_tool_calls.append(forced_call)
+                yield {"type": "tool_call", "name": forced_tool, "arguments": forced_args}
+                running_tools.append((forced_call, self._start_tool(forced_tool, forced_args)))
+            
+            # Every tool call named a tool we don't have and nothing else was said -
+            # tell the user instead of ending the turn empty
+            if unknown_tools and not tool_calls and not xml_tool_calls and not embedded_data and not streamed_parts and not held_text.strip():
+                held_text = (
+                    f"I can't help with that directly - {', '.join(unknown_tools)} isn't one of my tools. "
+                    "I can look up stock quotes, analysis, news, options flow and market scans."
+                )
+            
+            # Case 1: Model already included the data (Kimi token format with embedded results)
+            if embedded_data:
+                logger.info("[CHAT] Found embedded data - formatting directly")
                 
-                detected_phrase = next((p for p in planning_phrases if p in text_lower), None)
-                if detected_phrase and not xml_tool_calls and not embedded_data:
-                    logger.warning(f"[CHAT] ⚠️ Model announced plan ('{detected_phrase}') but didn't call tool - FORCING FALLBACK")
-                    
-                    # Get user's original question to determine what tool to call
-                    user_question = ""
-                    for msg in reversed(messages):
-                        if msg.get("role") == "user":
-                            user_question = msg.get("content", "").lower()
-                            break
-                    
-                    # Determine the right tool based on user question
-                    forced_tool = None
-                    forced_args = {}
-                    
-                    # Less restrictive searches - just get data, let Kimi analyze
-                    if any(kw in user_question for kw in ["biotech", "healthcare", "pharma", "drug"]):
-                        forced_tool = "scan_by_sector"
-                        forced_args = {"sector": "Healthcare", "sort_by": "change_percent", "limit": 20}
-                    elif any(kw in user_question for kw in ["tech", "software", "ai", "semiconductor"]):
-                        forced_tool = "scan_by_sector"
-                        forced_args = {"sector": "Technology", "sort_by": "change_percent", "limit": 20}
-                    elif any(kw in user_question for kw in ["energy", "oil", "gas"]):
-                        forced_tool = "scan_by_sector"
-                        forced_args = {"sector": "Energy", "sort_by": "change_percent", "limit": 20}
-                    elif any(kw in user_question for kw in ["finance", "bank", "financial"]):
-                        forced_tool = "scan_by_sector"
-                        forced_args = {"sector": "Financial Services", "sort_by": "change_percent", "limit": 20}
-                    elif any(kw in user_question for kw in ["gainer", "winner", "top", "best", "hot", "return"]):
-                        forced_tool = "scan_top_movers"
-                        forced_args = {"direction": "gainers", "limit": 20}
-                    elif any(kw in user_question for kw in ["loser", "worst", "down", "falling"]):
-                        forced_tool = "scan_top_movers"
-                        forced_args = {"direction": "losers", "limit": 20}
-                    elif any(kw in user_question for kw in ["volume", "unusual", "spike", "active"]):
-                        forced_tool = "scan_unusual_volume"
-                        forced_args = {"min_rvol": 1.5, "limit": 20}
-                    elif any(kw in user_question for kw in ["breakout", "high", "52"]):
-                        forced_tool = "scan_breakout_candidates"
-                        forced_args = {"type": "near_high", "limit": 20}
-                    else:
-                        # Default: top movers
-                        forced_tool = "scan_top_movers"
-                        forced_args = {"direction": "gainers", "limit": 20}
-                    
-                    if forced_tool:
-                        xml_tool_calls = [{
-                            "id": f"forced_{forced_tool}",
-                            "name": forced_tool,
-                            "arguments": forced_args
-                        }]
-                        logger.info(f"[CHAT] 🔧 FORCING TOOL: {forced_tool} with args: {forced_args}")
-                        # Clear the text buffer so we don't show "Let me search..."
-                        cleaned_text = ""
-                        # Don't yield the planning text - it's useless
-                        text_buffer = ""
+                # Yield any text before the tool output
+                if held_text.strip() and not held_text.strip().lower().startswith("let me"):
+                    yield {"type": "text", "content": held_text.strip() + "\n\n"}
+                elif streaming_text:
+                    yield {"type": "text", "content": "\n\n"}
                 
-                # Case 1: Model already included the data (Kimi token format with embedded results)
-                if embedded_data:
-                    logger.info(f"[CHAT] Found embedded data - formatting directly")
-                    
-                    # Yield any text before the tool output
-                    if cleaned_text and not cleaned_text.lower().startswith("let me"):
-                        yield {"type": "text", "content": cleaned_text + "\n\n"}
-                    
-                    yield {"type": "thinking", "content": "Formatting results..."}
-                    
-                    # Format the embedded data with a follow-up call
-                    results_summary = json.dumps(embedded_data, indent=2, default=str)
-                    
-                    user_question = ""
-                    for msg in reversed(messages):
-                        if msg.get("role") == "user":
-                            user_question = msg.get("content", "")
-                            break
-                    
-                    summary_system = """You are a financial analyst. Format this data into a clean response:
+                yield {"type": "thinking", "content": "Formatting results..."}
+                
+                # Format the embedded data with a follow-up call
+                results_summary = encode_tool_data(truncate_rows(embedded_data))
+                
+                summary_system = """You are a financial analyst. Format this data into a clean response:
 
 1. A Markdown table with the key data (Symbol, Price, Change, Volume, etc.)
 2. 1-2 sentences of insight
@@ -726,116 +1411,71 @@ class ChatService:
 
 NO tool calls. NO XML tags. Just format the data nicely."""
 
-                    follow_up_messages = [
-                        {"role": "system", "content": summary_system},
-                        {"role": "user", "content": f"Question: {user_question}\n\nData to format:\n```json\n{results_summary}\n```"}
-                    ]
-                    
-                    try:
-                        response = self._call_api(follow_up_messages, stream=True, tools=None)
-                        full_response = ""
-                        for chunk in self._parse_stream(response):
-                            if chunk.get("type") == "content":
-                                content = chunk["content"]
-                                full_response += content
-                                yield {"type": "text", "content": content}
-                        
-                        yield {"type": "done", "content": full_response}
-                        return
-                        
-                    except Exception as e:
-                        logger.error(f"[CHAT] Format call failed: {e}")
-                        # Fallback: format the data ourselves
-                        yield {"type": "text", "content": self._format_stocks_table(embedded_data)}
-                        yield {"type": "done", "content": ""}
-                        return
+                follow_up_messages = [
+                    {"role": "system", "content": summary_system},
+                    {"role": "user", "content": f"Question: {user_question}\n\nThe next message is the data to format (JSON)."},
+                    {"role": "user", "content": results_summary},
+                ]
                 
-                # Case 2: Need to execute tool calls
-                if xml_tool_calls:
-                    # Found XML tool calls - execute them and get results
-                    logger.info(f"[CHAT] ✓ Detected {len(xml_tool_calls)} XML-style tool calls")
-                    
-                    # Tell frontend we're thinking
-                    yield {"type": "thinking", "content": "Searching market data..."}
-                    
-                    # Execute all tools and collect results
-                    tool_results = []
-                    for tc in xml_tool_calls:
-                        tool_name = tc["name"]
-                        tool_args = tc["arguments"]
-                        logger.info(f"[CHAT] Executing tool: {tool_name}")
-                        yield {"type": "tool_call", "name": tool_name, "arguments": tool_args}
-                        
-                        # Add a "heartbeat" thread to yield thinking events while tool runs
-                        import queue
-                        import threading
-                        
-                        result_queue = queue.Queue()
-                        
-                        def _run_tool():
-                            try:
-                                res = self.tool_executor(tool_name, tool_args)
-                                result_queue.put(("success", res))
-                            except Exception as e:
-                                result_queue.put(("error", str(e)))
-                        
-                        tool_thread = threading.Thread(target=_run_tool)
-                        tool_thread.start()
-                        
-                        # Wait for result while yielding thinking events every 2 seconds
-                        tool_result = None
-                        start_wait = time.time()
-                        while tool_thread.is_alive():
-                            try:
-                                status, val = result_queue.get(timeout=2.0)
-                                if status == "success":
-                                    tool_result = val
-                                else:
-                                    logger.error(f"[CHAT] Tool error: {val}")
-                                    tool_result = {"error": val}
-                            except queue.Empty:
-                                # Tool still running, yield thinking to keep connection alive
-                                logger.info(f"[CHAT] Tool {tool_name} still running...")
-                                yield {"type": "thinking", "content": f"Running {tool_name}..."}
-                                
-                                # Timeout after 60 seconds
-                                if time.time() - start_wait > 60:
-                                    logger.error(f"[CHAT] Tool {tool_name} timed out")
-                                    tool_result = {"error": "Tool execution timed out"}
-                                    break
-                        
-                        if tool_result is None and not tool_thread.is_alive():
-                            # Thread finished but queue didn't have result yet
-                            try:
-                                status, val = result_queue.get(block=False)
-                                if status == "success":
-                                    tool_result = val
-                                else:
-                                    tool_result = {"error": val}
-                            except queue.Empty:
-                                tool_result = {"error": "Unknown tool failure"}
-
-                        tool_results.append({
-                            "tool": tool_name,
-                            "args": tool_args,
-                            "result": tool_result
-                        })
-                        yield {"type": "tool_result", "name": tool_name, "result": tool_result}
-                        logger.info(f"[CHAT] Tool {tool_name} complete")
+                try:
+                    response = self._call_api(follow_up_messages, stream=True, tools=None)
+                    response_parts = []
+                    for chunk in self._parse_stream(response, text_only=True):
+                        if chunk.get("type") == "content":
+                            content = chunk["content"]
+                            response_parts.append(content)
+                            yield {"type": "text", "content": content}
                     
-                    # Now make a follow-up call with the results
-                    # Use a SIMPLE system prompt that just asks for a summary (no tools)
-                    results_summary = json.dumps(tool_results, indent=2, default=str)
+                    yield {"type": "done", "content": "".join(response_parts)}
+                    return
                     
-                    # Get the original user question
-                    user_question = ""
-                    for msg in reversed(messages):
-                        if msg.get("role") == "user":
-                            user_question = msg.get("content", "")
-                            break
+                except Exception as e:
+                    logger.error("[CHAT] Format call failed: %s", e)
+                    # Fallback: format the data ourselves
+                    yield {"type": "text", "content": self._format_stocks_table(embedded_data)}
+                    yield {"type": "done", "content": ""}
+                    return
+            
+            # Case 2: XML tool calls (already running) - collect results
+            if xml_tool_calls:
+                logger.info("[CHAT] ✓ Detected %d XML-style tool calls", len(xml_tool_calls))
+                
+                tool_results = []
+                for tc, future in running_tools:
+                    tool_name = tc["name"]
+                    tool_result = yield from self._wait_for_tool(tool_name, future)
                     
-                    # Simple follow-up prompt that won't trigger more tool calls
-                    summary_system = """You are a financial analyst. Present the tool results to the user.
+                    tool_results.append({
+                        "tool": tool_name,
+                        "args": tc["arguments"],
+                        "result": tool_result
+                    })
+                    yield {"type": "tool_result", "name": tool_name, "result": tool_result}
+                    logger.info("[CHAT] Tool %s complete", tool_name)
+                
+                if self._can_format_locally(user_question, tool_results):
+                    logger.info("[CHAT] Formatting %s results locally - skipping follow-up call", tool_results[0]["tool"])
+                    full_response = self._format_stocks_table(tool_results[0]["result"])
+                    yield {"type": "text", "content": full_response}
+                    yield {"type": "done", "content": full_response}
+                    return
+                
+                results_summary = encode_tool_data([{**tr, "result": truncate_rows(tr["result"])} for tr in tool_results])
+                
+                # Same question answered with the same data moments ago - reuse that summary
+                summary_key = summary_cache_key(self.model, user_question, results_summary)
+                cached_summary = self._summary_cache.get(summary_key)
+                if cached_summary is not None:
+                    logger.info("[CHAT] Summary cache hit - skipping follow-up call")
+                    yield {"type": "text", "content": cached_summary}
+                    yield {"type": "done", "content": cached_summary}
+                    return
+                
+                # Now make a follow-up call with the results
+                # Use a SIMPLE system prompt that just asks for a summary (no tools)
+                
+                # Simple follow-up prompt that won't trigger more tool calls
+                summary_system = """You are a financial analyst. Present the tool results to the user.
 
 RULES:
 1. If stocks were found: Create a Markdown table (Ticker | Price | Change | Volume | Sector)
@@ -849,82 +1489,102 @@ FORBIDDEN:
 - Do NOT call any tools
 - Do NOT use XML tags
 - Just present the data you have"""
+                
+                follow_up_messages = [
+                    {"role": "system", "content": summary_system},
+                    {"role": "user", "content": f"User's question: {user_question}\n\nThe next message is the tool results (JSON). Present this data in a helpful, formatted response with a table if applicable."},
+                    {"role": "user", "content": results_summary},
+                ]
+                
+                logger.info("[CHAT] Making follow-up API call to summarize %d chars of tool results...", len(results_summary))
+                
+                try:
+                    response = self._call_api(follow_up_messages, stream=True, tools=None)
                     
-                    follow_up_messages = [
-                        {"role": "system", "content": summary_system},
-                        {"role": "user", "content": f"User's question: {user_question}\n\nTool results (format this nicely):\n```json\n{results_summary}\n```\n\nPresent this data in a helpful, formatted response with a table if applicable."}
-                    ]
+                    response_parts = []
+                    # Strip any stray tool tags (shouldn't happen but be safe) - the scanner
+                    # keeps state across chunks, so each chunk is searched for '<' only once
+                    follow_up_scanner = ToolTagScanner()
+                    for chunk in self._parse_stream(response, text_only=True):
+                        if chunk.get("type") == "content":
+                            content, stray_calls = follow_up_scanner.feed(chunk["content"])
+                            if stray_calls:
+                                logger.warning("[CHAT] Dropped %d tool call(s) from follow-up response", len(stray_calls))
+                            if content:
+                                response_parts.append(content)
+                                yield {"type": "text", "content": content}
+                    tail = follow_up_scanner.flush()
+                    if tail:
+                        response_parts.append(tail)
+                        yield {"type": "text", "content": tail}
+                    full_response = "".join(response_parts)
                     
-                    logger.info(f"[CHAT] Making follow-up API call to summarize {len(results_summary)} chars of tool results...")
+                    logger.info("[CHAT] Follow-up response complete: %d chars", len(full_response))
                     
-                    try:
-                        response = self._call_api(follow_up_messages, stream=True, tools=None)
-                        
-                        full_response = ""
-                        for chunk in self._parse_stream(response):
-                            if chunk.get("type") == "content":
-                                content = chunk["content"]
-                                # Clean any stray XML tags (shouldn't happen but be safe)
-                                if '<' in content and '>' in content:
-                                    content, _ = self._extract_xml_tool_calls(content)
-                                full_response += content
-                                yield {"type": "text", "content": content}
-                        
-                        logger.info(f"[CHAT] Follow-up response complete: {len(full_response)} chars")
-                        
-                        # If we got no response, yield an error
-                        if not full_response.strip():
-                            logger.error("[CHAT] Follow-up returned empty response!")
-                            yield {"type": "text", "content": "\n\nI found the data but had trouble formatting it. Here's the raw result:\n\n"}
-                            yield {"type": "text", "content": f"```json\n{results_summary[:2000]}\n```"}
-                            
-                    except Exception as e:
-                        logger.error(f"[CHAT] Follow-up API call failed: {e}")
-                        yield {"type": "text", "content": f"\n\nI executed the search but encountered an error formatting results: {str(e)[:100]}"}
-                        yield {"type": "text", "content": f"\n\nRaw data:\n```json\n{results_summary[:1500]}\n```"}
+                    summary_ttl = replay_ttl(SUMMARY_CACHE_TTL, (tr["tool"] for tr in tool_results))
+                    if full_response.strip() and summary_ttl > 0 and not has_tool_errors(tool_results):
+                        self._summary_cache.set(summary_key, full_response, ttl_seconds=summary_ttl)
                     
-                else:
-                    # No XML tool calls - stream the text normally
-                    full_response = text_buffer
-                    yield {"type": "text", "content": text_buffer}
+                    # If we got no response, yield an error
+                    if not full_response.strip():
+                        logger.error("[CHAT] Follow-up returned empty response!")
+                        yield {"type": "text", "content": "\n\nI found the data but had trouble formatting it. Here's the raw result:\n\n"}
+                        yield {"type": "text", "content": f"```json\n{results_summary[:2000]}\n```"}
+                        
+                except Exception as e:
+                    logger.error("[CHAT] Follow-up API call failed: %s", e)
+                    yield {"type": "text", "content": f"\n\nI executed the search but encountered an error formatting results: {str(e)[:100]}"}
+                    yield {"type": "text", "content": f"\n\nRaw data:\n```json\n{results_summary[:1500]}\n```"}
+                
+            else:
+                # No XML tool calls - release any text still held back
+                if held_text:
+                    streamed_parts.append(held_text)
+                    yield {"type": "text", "content": held_text}
+                full_response = "".join(streamed_parts)
             
             # Handle API-style tool calls (from tool_calls in response)
             if tool_calls and self.tool_executor and not xml_tool_calls:
-                logger.info(f"[CHAT] Processing {len(tool_calls)} API-style tool calls")
+                logger.info("[CHAT] Processing %d API-style tool calls", len(tool_calls))
                 
-                # Execute all tools and collect results
-                tool_results = []
+                # Start every tool up front - they're independent network/DB
+                # calls, so total latency is the slowest tool, not the sum
+                running = []
                 for tool_call in tool_calls:
+                    yield {"type": "tool_call", "name": tool_call["name"], "arguments": tool_call["arguments"]}
+                    running.append((tool_call, self._take_early_tool(early_tools, tool_call)))
+                
+                # Collect results in call order
+                tool_results = []
+                for tool_call, future in running:
                     tool_name = tool_call["name"]
-                    tool_args = tool_call["arguments"]
-                    
-                    yield {"type": "tool_call", "name": tool_name, "arguments": tool_args}
-                    
-                    try:
-                        result = self.tool_executor(tool_name, tool_args)
-                        yield {"type": "tool_result", "name": tool_name, "result": result}
-                        tool_results.append({
-                            "tool": tool_name,
-                            "args": tool_args,
-                            "result": result
-                        })
-                    except Exception as e:
-                        logger.error(f"Tool execution error: {e}")
-                        yield {"type": "error", "content": f"Tool error: {str(e)}"}
-                        tool_results.append({
-                            "tool": tool_name,
-                            "args": tool_args,
-                            "result": {"error": str(e)}
-                        })
+                    result = yield from self._wait_for_tool(tool_name, future)
+                    yield {"type": "tool_result", "name": tool_name, "result": result}
+                    tool_results.append({
+                        "tool": tool_name,
+                        "args": tool_call["arguments"],
+                        "result": result
+                    })
                 
-                # Use summary system prompt for follow-up (prevents "Let me scan..." responses)
-                results_summary = json.dumps(tool_results, indent=2, default=str)
+                if self._can_format_locally(user_question, tool_results):
+                    logger.info("[CHAT] Formatting %s results locally - skipping follow-up call", tool_results[0]["tool"])
+                    full_response = self._format_stocks_table(tool_results[0]["result"])
+                    yield {"type": "text", "content": full_response}
+                    yield {"type": "done", "content": full_response}
+                    return
+                
+                results_summary = encode_tool_data([{**tr, "result": truncate_rows(tr["result"])} for tr in tool_results])
+                
+                # Same question answered with the same data moments ago - reuse that summary
+                summary_key = summary_cache_key(self.model, user_question, results_summary)
+                cached_summary = self._summary_cache.get(summary_key)
+                if cached_summary is not None:
+                    logger.info("[CHAT] Summary cache hit - skipping follow-up call")
+                    yield {"type": "text", "content": cached_summary}
+                    yield {"type": "done", "content": cached_summary}
+                    return
                 
-                user_question = ""
-                for msg in reversed(messages):
-                    if msg.get("role") == "user":
-                        user_question = msg.get("content", "")
-                        break
+                # Use summary system prompt for follow-up (prevents "Let me scan..." responses)
                 
                 summary_system = """You are a financial analyst. Present the tool results to the user.
 
@@ -943,23 +1603,29 @@ FORBIDDEN:
                 
                 follow_up_messages = [
                     {"role": "system", "content": summary_system},
-                    {"role": "user", "content": f"User's question: {user_question}\n\nTool results:\n```json\n{results_summary}\n```\n\nPresent this data helpfully."}
+                    {"role": "user", "content": f"User's question: {user_question}\n\nThe next message is the tool results (JSON). Present this data helpfully."},
+                    {"role": "user", "content": results_summary},
                 ]
                 
-                logger.info(f"[CHAT] Making follow-up call with summary system prompt")
+                logger.info("[CHAT] Making follow-up call with summary system prompt")
                 response = self._call_api(follow_up_messages, stream=True, tools=None)
                 
-                full_response = ""
-                for chunk in self._parse_stream(response):
+                response_parts = []
+                for chunk in self._parse_stream(response, text_only=True):
                     if chunk.get("type") == "content":
                         content = chunk["content"]
-                        full_response += content
+                        response_parts.append(content)
                         yield {"type": "text", "content": content}
+                full_response = "".join(response_parts)
+                
+                summary_ttl = replay_ttl(SUMMARY_CACHE_TTL, (tr["tool"] for tr in tool_results))
+                if full_response.strip() and summary_ttl > 0 and not has_tool_errors(tool_results):
+                    self._summary_cache.set(summary_key, full_response, ttl_seconds=summary_ttl)
             
             yield {"type": "done", "content": full_response}
             
         except Exception as e:
-            logger.error(f"Chat stream error: {e}")
+            logger.error("Chat stream error: %s", e)
             yield {"type": "error", "content": str(e)}
     
     def chat_sync(
@@ -977,19 +1643,19 @@ FORBIDDEN:
             "sources": [...],
         }
         """
-        full_response = ""
+        response_parts = []
         tools_used = []
         
         for chunk in self.chat_stream(messages, use_tools):
             if chunk["type"] == "text":
-                full_response += chunk["content"]
+                response_parts.append(chunk["content"])
             elif chunk["type"] == "tool_call":
                 tools_used.append(chunk["name"])
             elif chunk["type"] == "error":
                 return {"error": chunk["content"]}
         
         return {
-            "response": full_response,
+            "response": "".join(response_parts),
             "tools_used": tools_used,
         }
     
@@ -1001,32 +1667,27 @@ FORBIDDEN:
     ) -> requests.Response:
         """Make API call to OpenRouter"""
         
-        url = f"{self.api_base}/chat/completions"
-        
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": OPENROUTER_APP_URL,
-            "X-Title": OPENROUTER_APP_NAME,
-        }
-        
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "stream": stream,
-            "temperature": 0.7,
-        }
+        # Build the JSON body by hand so the static tool definitions are
+        # spliced in pre-serialized instead of re-encoded every turn
+        body = [self._body_prefixes[stream]]
         
         if tools:
-            payload["tools"] = tools
-            payload["tool_choice"] = "auto"
+            tools_json = AVAILABLE_TOOLS_JSON if tools is AVAILABLE_TOOLS else orjson.dumps(tools)
+            body += [b',"tool_choice":"auto","tools":', tools_json]
         
-        response = requests.post(
-            url, 
-            headers=headers, 
-            json=payload, 
+        if messages and messages[0] is SYSTEM_MESSAGE:
+            # Splice in the pre-serialized system message, encode only the conversation
+            rest = orjson.dumps(messages[1:])
+            body += [b',"messages":[', SYSTEM_MESSAGE_JSON, b"," + rest[1:] if len(messages) > 1 else b"]", b"}"]
+        else:
+            body += [b',"messages":', orjson.dumps(messages), b"}"]
+        
+        response = openrouter_session().post(
+            self._completions_url, 
+            data=b"".join(body), 
             stream=stream,
-            timeout=120
+            headers=self._stream_headers if stream else self._headers,
+            timeout=API_TIMEOUT
         )
         
         if response.status_code != 200:
@@ -1034,104 +1695,244 @@ FORBIDDEN:
         
         return response
     
-    def _parse_stream(self, response: requests.Response) -> Generator[dict, None, None]:
+    def _iter_sse_batches(self, response: requests.Response) -> Generator[list[bytes], None, None]:
+        """
+        Yield the SSE "data:" payloads as raw bytes, one list per network read
+        
+        Splits the byte stream directly instead of going through iter_lines(),
+        so comments and keep-alives are skipped without decoding and payloads
+        go straight to orjson. Frames that arrived together stay together so
+        the parser can merge them without waiting on the network.
+        """
+        buffer = bytearray()
+        for block in response.iter_content(chunk_size=None):
+            buffer += block
+            batch = []
+            start = 0
+            while True:
+                end = buffer.find(b"\n", start)
+                if end == -1:
+                    break
+                if buffer.startswith(b"data:", start):
+                    payload = bytes(buffer[start + 5:end]).strip()
+                    if payload:
+                        batch.append(payload)
+                start = end + 1
+            del buffer[:start]
+            if batch:
+                yield batch
+        
+        # Final line without a trailing newline
+        if buffer.startswith(b"data:"):
+            payload = bytes(buffer[5:]).strip()
+            if payload:
+                yield [payload]
+    
+    def _drain_pending(self, pending_tool_calls: list[Optional[dict]]) -> Generator[dict, None, None]:
+        """
+        Yield the accumulated streamed tool calls in index order, then clear them
+        
+        Calls that arrived without an id get call_<name>_<index>, unique
+        within the response like the XML path's ids.
+        """
+        for idx, tc in enumerate(pending_tool_calls):
+            if tc and tc["name"]:  # Only yield if we have a name
+                yield {
+                    "type": "tool_call",
+                    "id": tc["id"] or f"call_{tc['name']}_{idx}",
+                    "name": tc["name"],
+                    "arguments": parse_tool_arguments("".join(tc["arguments_parts"]))
+                }
+        pending_tool_calls.clear()
+    
+    def _parse_stream(
+        self,
+        response: requests.Response,
+        text_only: bool = False,
+    ) -> Generator[dict, None, None]:
+        """
+        Parse SSE stream from OpenRouter, logging its timing when it ends
+        
+        text_only=True is for calls made without tools: only text deltas are
+        read (see _parse_sse_text).
+        
+        headers_ms is request send -> response headers (requests' elapsed);
+        first_content_ms and total_ms are measured from the headers.
+        """
+        parse = self._parse_sse_text if text_only else self._parse_sse_events
+        started = time.perf_counter()
+        first_content = None
+        last_content = started
+        max_gap = 0.0
+        content_events = 0
+        try:
+            for event in parse(response):
+                if event["type"] == "content":
+                    now = time.perf_counter()
+                    if first_content is None:
+                        first_content = now
+                    else:
+                        max_gap = max(max_gap, now - last_content)
+                    last_content = now
+                    content_events += 1
+                yield event
+        finally:
+            # A no-op after a complete read (the connection is already back in
+            # the pool); on an early exit it drops the half-read connection
+            response.close()
+            logger.info(
+                "[CHAT] Stream timing: headers_ms=%.0f first_content_ms=%s total_ms=%.0f content_events=%d max_gap_ms=%.0f",
+                response.elapsed.total_seconds() * 1000,
+                "-" if first_content is None else f"{(first_content - started) * 1000:.0f}",
+                (time.perf_counter() - started) * 1000,
+                content_events,
+                max_gap * 1000,
+            )
+    
+    def _parse_sse_events(self, response: requests.Response) -> Generator[dict, None, None]:
         """Parse SSE stream from OpenRouter
         
+        Text deltas from frames that arrived in the same network read are
+        merged into one "content" event.
+        
         Tool calls come in multiple chunks:
         - First chunk: has id and name
         - Subsequent chunks: have arguments (as partial JSON strings)
-        - We accumulate and only yield when complete
+        - Each piece is yielded as a "tool_call_delta" as it arrives, and the
+          parsed "tool_call" once the call is complete
         """
         
-        # Accumulator for tool calls (keyed by index)
-        pending_tool_calls: dict[int, dict] = {}
+        # Accumulator for tool calls - indices are small and dense, so a list
+        # slot per index keeps them in call order without sorting
+        pending_tool_calls: list[Optional[dict]] = []
+        text_parts: list[str] = []
         
-        for line in response.iter_lines():
-            if not line:
-                continue
+        batches = self._iter_sse_batches(response)
+        for batch in batches:
+            for data in batch:
+                if data == b"[DONE]":
+                    # Read the body to its end so urllib3 returns the connection to the pool
+                    for _ in batches:
+                        pass
+                    
+                    if text_parts:
+                        yield {"type": "content", "content": "".join(text_parts)}
+                    
+                    # Stream ended - yield any pending complete tool calls
+                    yield from self._drain_pending(pending_tool_calls)
+                    return
                 
-            line = line.decode("utf-8")
-            
-            if line.startswith("data: "):
-                data = line[6:]
+                # Keep-alives and usage/metadata frames carry nothing we read - skip the parse
+                if b'"content"' not in data and b'"tool_calls"' not in data and b'"finish_reason"' not in data:
+                    continue
                 
-                if data == "[DONE]":
-                    # Stream ended - yield any pending complete tool calls
-                    for idx in sorted(pending_tool_calls.keys()):
+                # Plain text frame (the common case) - read the text without parsing the envelope
+                content = fast_content(data)
+                if content is not None:
+                    if content:
+                        text_parts.append(content)
+                    continue
+                
+                frame = parse_openai_frame(data)
+                if frame is None:
+                    continue
+                delta, finish_reason = frame
+                
+                # Text content
+                content = delta.get("content")
+                if content:
+                    text_parts.append(content)
+                    
+                    # Plain text frame (the common case) - nothing else to look at
+                    if finish_reason is None and "tool_calls" not in delta:
+                        continue
+                
+                # Anything other than text goes out after the text before it
+                tool_call_deltas = delta.get("tool_calls")
+                if text_parts and (tool_call_deltas or finish_reason == "tool_calls"):
+                    yield {"type": "content", "content": "".join(text_parts)}
+                    text_parts.clear()
+                
+                # Tool calls - accumulate across chunks
+                if tool_call_deltas:
+                    for tool_call in tool_call_deltas:
+                        idx = tool_call.get("index", 0)
+                        
+                        # Initialize if new
+                        if idx >= len(pending_tool_calls):
+                            pending_tool_calls.extend([None] * (idx + 1 - len(pending_tool_calls)))
                         tc = pending_tool_calls[idx]
-                        if tc.get("name"):  # Only yield if we have a name
-                            # Try to parse accumulated arguments
-                            args_str = tc.get("arguments_str", "")
-                            try:
-                                args = json.loads(args_str) if args_str else {}
-                            except json.JSONDecodeError:
-                                args = {"raw": args_str}  # Fallback
-                            
+                        if tc is None:
+                            tc = pending_tool_calls[idx] = {
+                                "id": None,
+                                "name": None,
+                                "arguments_parts": []
+                            }
+                        
+                        # Accumulate data
+                        if tool_call.get("id"):
+                            tc["id"] = tool_call["id"]
+                        
+                        func = tool_call.get("function") or EMPTY_DELTA
+                        name_delta = func.get("name")
+                        arguments_delta = func.get("arguments")
+                        if name_delta:
+                            # Same object as the literal tool names, so later lookups hit by identity
+                            tc["name"] = sys.intern(name_delta)
+                        if arguments_delta:
+                            tc["arguments_parts"].append(arguments_delta)
+                        
+                        # Pass progress along so callers can react before the call completes
+                        if name_delta or arguments_delta:
                             yield {
-                                "type": "tool_call",
-                                "id": tc.get("id", f"call_{tc['name']}"),
-                                "name": tc["name"],
-                                "arguments": args
+                                "type": "tool_call_delta",
+                                "index": idx,
+                                "id": tc["id"],
+                                "name": name_delta,
+                                "arguments_delta": arguments_delta or "",
                             }
-                    break
                 
-                try:
-                    chunk = json.loads(data)
-                    choices = chunk.get("choices", [])
-                    if not choices:
-                        continue
-                        
-                    delta = choices[0].get("delta", {})
-                    finish_reason = choices[0].get("finish_reason")
-                    
-                    # Text content
-                    if delta.get("content"):
-                        yield {"type": "content", "content": delta["content"]}
-                    
-                    # Tool calls - accumulate across chunks
-                    if delta.get("tool_calls"):
-                        for tool_call in delta["tool_calls"]:
-                            idx = tool_call.get("index", 0)
-                            
-                            # Initialize if new
-                            if idx not in pending_tool_calls:
-                                pending_tool_calls[idx] = {
-                                    "id": None,
-                                    "name": None,
-                                    "arguments_str": ""
-                                }
-                            
-                            # Accumulate data
-                            if tool_call.get("id"):
-                                pending_tool_calls[idx]["id"] = tool_call["id"]
-                            
-                            if tool_call.get("function"):
-                                func = tool_call["function"]
-                                if func.get("name"):
-                                    pending_tool_calls[idx]["name"] = func["name"]
-                                if func.get("arguments"):
-                                    pending_tool_calls[idx]["arguments_str"] += func["arguments"]
+                # If finish_reason is "tool_calls", yield the accumulated tool calls
+                if finish_reason == "tool_calls":
+                    yield from self._drain_pending(pending_tool_calls)
+            
+            # End of this network read - send the merged text now
+            if text_parts:
+                yield {"type": "content", "content": "".join(text_parts)}
+                text_parts.clear()
+    
+    def _parse_sse_text(self, response: requests.Response) -> Generator[dict, None, None]:
+        """
+        Parse SSE stream from a call made without tools - "content" events only
+        
+        Same batching as _parse_sse_events, minus the tool call bookkeeping.
+        """
+        text_parts: list[str] = []
+        
+        batches = self._iter_sse_batches(response)
+        for batch in batches:
+            for data in batch:
+                if data == b"[DONE]":
+                    # Read the body to its end so urllib3 returns the connection to the pool
+                    for _ in batches:
+                        pass
                     
-                    # If finish_reason is "tool_calls", yield the accumulated tool calls
-                    if finish_reason == "tool_calls":
-                        for idx in sorted(pending_tool_calls.keys()):
-                            tc = pending_tool_calls[idx]
-                            if tc.get("name"):
-                                args_str = tc.get("arguments_str", "")
-                                try:
-                                    args = json.loads(args_str) if args_str else {}
-                                except json.JSONDecodeError:
-                                    args = {"raw": args_str}
-                                
-                                yield {
-                                    "type": "tool_call",
-                                    "id": tc.get("id", f"call_{tc['name']}"),
-                                    "name": tc["name"],
-                                    "arguments": args
-                                }
-                        # Clear after yielding
-                        pending_tool_calls.clear()
-                                
-                except json.JSONDecodeError:
+                    if text_parts:
+                        yield {"type": "content", "content": "".join(text_parts)}
+                    return
+                
+                if b'"content"' not in data:
                     continue
+                
+                content = fast_content(data)
+                if content is None:
+                    frame = parse_openai_frame(data)
+                    content = frame[0].get("content") if frame else None
+                if content:
+                    text_parts.append(content)
+            
+            # End of this network read - send the merged text now
+            if text_parts:
+                yield {"type": "content", "content": "".join(text_parts)}
+                text_parts.clear()
 
@@ -38,11 +38,18 @@ logger = logging.getLogger(__name__)
 # ═══════════════════════════════════════════════════════════════
 
 class SimpleCache:
-    """Thread-safe in-memory cache with TTL"""
+    """
+    Thread-safe in-memory cache with TTL
     
-    def __init__(self):
+    With max_entries set, the cache is bounded: when a set() pushes it past
+    the limit, expired entries are dropped first, then the least recently
+    used ones.
+    """
+    
+    def __init__(self, max_entries: Optional[int] = None):
         self._cache: Dict[str, Dict[str, Any]] = {}
         self._lock = threading.Lock()
+        self.max_entries = max_entries
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
@@ -50,6 +57,9 @@ class SimpleCache:
             if key in self._cache:
                 entry = self._cache[key]
                 if datetime.now(timezone.utc) < entry["expires"]:
+                    if self.max_entries:
+                        # Most recently used entries live at the end
+                        self._cache[key] = self._cache.pop(key)
                     return entry["value"]
                 else:
                     del self._cache[key]
@@ -58,10 +68,21 @@ class SimpleCache:
     def set(self, key: str, value: Any, ttl_seconds: int):
         """Set value in cache with TTL"""
         with self._lock:
+            self._cache.pop(key, None)
             self._cache[key] = {
                 "value": value,
                 "expires": datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
             }
+            if self.max_entries and len(self._cache) > self.max_entries:
+                self._evict()
+    
+    def _evict(self):
+        """Drop expired entries, then the least recently used until within max_entries (lock held)"""
+        now = datetime.now(timezone.utc)
+        for k in [k for k, v in self._cache.items() if now >= v["expires"]]:
+            del self._cache[k]
+        while len(self._cache) > self.max_entries:
+            del self._cache[next(iter(self._cache))]
     
     def clear_expired(self):
         """Remove expired entries (call periodically)"""